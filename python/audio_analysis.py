@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Librosa analyses that preprocess_full runs in worker processes.
+
+Kept free of torch / torchcrepe so spawned workers start quickly and stay
+small: importing this module pulls in only numpy, scipy and librosa.
+
+Usage:
+    from audio_analysis import analyze_rhythm, run_on_shared_audio
+    executor.submit(run_on_shared_audio, analyze_rhythm, audio_spec, sr)
+"""
+
+from multiprocessing import shared_memory
+
+import librosa
+import numpy as np
+from scipy.signal import savgol_filter
+
+from librosa_compat import patch_beat_track_dp
+
+# Keep librosa's beat tracking DP in nopython mode on newer Numba releases
+patch_beat_track_dp()
+
+
+def extract_chroma(y, sr, hop_length=1024):
+    """Extract chroma features for alignment."""
+    chroma = librosa.feature.chroma_cqt(
+        y=y,
+        sr=sr,
+        hop_length=hop_length,
+        n_chroma=12,
+        bins_per_octave=36
+    )
+
+    # Normalize each frame
+    chroma = chroma / (np.linalg.norm(chroma, axis=0, keepdims=True) + 1e-8)
+
+    return chroma
+
+
+def onset_envelope(audio, sr, hop_length=1024):
+    """Median-aggregated onset strength (the envelope librosa's beat tracker uses)."""
+    return librosa.onset.onset_strength(
+        y=audio,
+        sr=sr,
+        hop_length=hop_length,
+        aggregate=np.median
+    )
+
+
+def detect_beats_and_downbeats(audio, sr, hop_length=1024, onset_env=None):
+    """Extract beats and downbeats for rhythm scoring."""
+    print("🥁 Detecting beats and downbeats...")
+
+    if onset_env is None:
+        onset_env = onset_envelope(audio, sr, hop_length=hop_length)
+
+    # Beat tracking
+    tempo, beat_frames = librosa.beat.beat_track(
+        onset_envelope=onset_env,
+        sr=sr,
+        hop_length=hop_length,
+        trim=False
+    )
+
+    beats = librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop_length)
+
+    # librosa >= 0.10.2 returns tempo as a 1-element array
+    tempo = float(np.atleast_1d(tempo)[0])
+
+    # Estimate downbeats (every 4th beat typically)
+    # This is a simplification; more sophisticated methods can be used
+    # (copied so orjson can serialize a contiguous array)
+    downbeats = beats[::4].copy()
+
+    print(f"✅ Found {len(beats)} beats, {len(downbeats)} downbeats")
+    print(f"   Tempo: {tempo:.1f} BPM")
+
+    return beats, downbeats, tempo
+
+
+def detect_phrases(audio, sr, beats, hop_length=1024, onset_env=None):
+    """Detect musical phrases using onset strength and structure."""
+    print("📝 Detecting phrases...")
+
+    # Onset strength envelope
+    if onset_env is None:
+        onset_env = onset_envelope(audio, sr, hop_length=hop_length)
+
+    # Detect onsets
+    onsets = librosa.onset.onset_detect(
+        onset_envelope=onset_env,
+        sr=sr,
+        hop_length=hop_length,
+        units='time',
+        delta=0.3,
+        wait=2.0  # Minimum 2 seconds between phrase boundaries
+    )
+
+    # Create phrases from gaps between consecutive onsets
+    starts = onsets[:-1]
+    ends = onsets[1:]
+    long_gaps = np.flatnonzero(ends - starts > 2.0)  # Minimum phrase length
+
+    phrases = [
+        {'id': int(i) + 1, 'start': float(starts[i]), 'end': float(ends[i])}
+        for i in long_gaps
+    ]
+
+    # Add final phrase
+    if len(onsets) > 0:
+        duration = len(audio) / sr
+        if duration - onsets[-1] > 2.0:
+            phrases.append({
+                'id': len(phrases) + 1,
+                'start': float(onsets[-1]),
+                'end': float(duration)
+            })
+
+    print(f"✅ Detected {len(phrases)} phrases")
+
+    return phrases
+
+
+def analyze_rhythm(audio, sr, hop_length=1024):
+    """Detect beats and phrases on the karaoke track as a single worker task."""
+    # One onset envelope (STFT + mel pass) feeds both beat and phrase detection
+    onset_env = onset_envelope(audio, sr, hop_length=hop_length)
+
+    beats, downbeats, tempo = detect_beats_and_downbeats(
+        audio, sr, hop_length=hop_length, onset_env=onset_env
+    )
+    phrases = detect_phrases(audio, sr, beats, hop_length=hop_length, onset_env=onset_env)
+
+    return beats, downbeats, tempo, phrases
+
+
+def calculate_loudness_profile(audio, sr, hop_length=1024):
+    """Calculate LUFS-style loudness profile for energy scoring."""
+    print("📊 Calculating loudness profile...")
+
+    # RMS energy
+    rms = librosa.feature.rms(y=audio, hop_length=hop_length)[0]
+
+    # Convert to dB
+    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+
+    # Create time array
+    times = librosa.frames_to_time(np.arange(len(rms_db)), sr=sr, hop_length=hop_length)
+
+    # Smooth
+    rms_smooth = savgol_filter(rms_db, window_length=21, polyorder=3)
+
+    # Create loudness profile (ms timestamps, 0.01 dB resolution)
+    loudness = [
+        {'t': float(t), 'LUFS': float(lufs)}
+        for t, lufs in zip(np.round(times, 3), np.round(rms_smooth.astype(np.float64), 2))
+    ]
+
+    print(f"✅ Calculated loudness profile: {len(loudness)} frames")
+
+    return loudness
+
+
+def run_on_shared_audio(func, audio_spec, *args, **kwargs):
+    """Worker entry point: attach to shared audio and run an analysis function on it."""
+    name, shape, dtype = audio_spec
+    shm = shared_memory.SharedMemory(name=name)
+    audio = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    try:
+        return func(audio, *args, **kwargs)
+    finally:
+        del audio
+        shm.close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compatibility patches for librosa's Numba kernels.
+
+librosa >= 0.10.2 passes float bounds to range() in the beat tracker's
+dynamic program, which newer Numba releases reject (or compile with float
+loop bounds). The patched kernel casts the bounds to int once per frame so
+the DP stays in nopython mode with integer-only loop codegen.
+
+Usage:
+    from librosa_compat import patch_beat_track_dp
+    patch_beat_track_dp()
+"""
+
+import re
+
+import librosa
+import numba
+import numpy as np
+
+
+@numba.guvectorize(
+    [
+        "void(float32[:], float32[:], float32, int32[:], float32[:])",
+        "void(float64[:], float64[:], float32, int32[:], float64[:])",
+    ],
+    "(t),(n),()->(t),(t)",
+    nopython=True,
+    cache=True
+)
+def _beat_track_dp(localscore, frames_per_beat, tightness, backlink, cumscore):
+    """librosa.beat.__beat_track_dp with integer range() bounds."""
+    # Threshold for the first beat to exceed
+    score_thresh = 0.01 * localscore.max()
+
+    # Are we on the first beat?
+    first_beat = True
+    backlink[0] = -1
+    cumscore[0] = localscore[0]
+
+    # Time-varying tempo uses frames_per_beat[i], constant tempo frames_per_beat[0]
+    tv = int(len(frames_per_beat) > 1)
+
+    for i, score_i in enumerate(localscore):
+        best_score = -np.inf
+        beat_location = -1
+        fpb = frames_per_beat[tv * i]
+
+        # Search over all possible predecessors to find the best preceding beat
+        for loc in range(i - int(round(fpb / 2)), int(i - 2 * fpb - 1), -1):
+            # Once we're searching past the start, break out
+            if loc < 0:
+                break
+            score = cumscore[loc] - tightness * (np.log(i - loc) - np.log(fpb)) ** 2
+            if score > best_score:
+                best_score = score
+                beat_location = loc
+
+        # Add the local score
+        if beat_location >= 0:
+            cumscore[i] = score_i + best_score
+        else:
+            # No back-link found, so just use the current score
+            cumscore[i] = score_i
+
+        # Special case the first onset.  Stop if the localscore is small
+        if first_beat and score_i < score_thresh:
+            backlink[i] = -1
+        else:
+            backlink[i] = beat_location
+            first_beat = False
+
+
+def patch_beat_track_dp():
+    """
+    Swap in the integer-bound beat tracking DP.
+
+    Only applied to librosa versions whose DP has this exact signature
+    (0.10.2 through 0.11.x); returns True if the patch was applied.
+    """
+    version = tuple(int(part) for part in re.findall(r'\d+', librosa.__version__)[:3])
+
+    if not (0, 10, 2) <= version < (0, 12, 0):
+        return False
+
+    # Module-level dunder names are not mangled; __beat_tracker looks this up
+    # as a global at call time
+    setattr(librosa.beat, '__beat_track_dp', _beat_track_dp)
+
+    return True
@@ -6,7 +6,7 @@ This script:
 1. Extracts audio from karaoke video (instrumental with baked-in lyrics)
 2. Separates vocals from original studio track (Demucs v4 with MPS)
 3. Aligns karaoke to original using DTW on chroma features
-4. Extracts pitch contour with torch-crepe (MPS-optimized)
+4. Extracts pitch contour with torch-crepe (MPS-optimized) or FFT-based YIN
 5. Warps reference pitch to karaoke timeline
 6. Creates note bins and phrase segmentation
 7. Generates comprehensive reference.json for runtime scoring
@@ -21,24 +21,38 @@ Usage:
 """
 
 import argparse
-import json
+import hashlib
 import os
+import shutil
 import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context, shared_memory
 from pathlib import Path
 from typing import List, Tuple, Dict
 
+# Persist Numba's JIT cache (librosa kernels, yin_fft) across runs; must be set
+# before anything imports numba. Warm it with warm_numba_cache().
+os.environ.setdefault('NUMBA_CACHE_DIR', os.path.expanduser('~/.cache/pitchperfectly/numba'))
+
 import numpy as np
-import torch
-import torchcrepe
+import orjson
 import librosa
 import soundfile as sf
 from scipy import signal
 from scipy.ndimage import median_filter
+from scipy.signal import savgol_filter
 from scipy.interpolate import interp1d
 from dtaidistance import dtw
 from tqdm import tqdm
 
+from audio_analysis import (
+    analyze_rhythm,
+    calculate_loudness_profile,
+    extract_chroma,
+    run_on_shared_audio
+)
+
 warnings.filterwarnings('ignore')
 
 
@@ -53,6 +67,10 @@ class PreprocessorConfig:
     CREPE_MODEL = 'full'  # 'tiny', 'small', 'medium', 'large', 'full'
     CREPE_STEP_SIZE = 20  # 20ms for real-time compatibility
 
+    # YIN settings (used with --pitch-method yin)
+    YIN_FRAME_LENGTH = 2048  # ~43ms at 48kHz, covers two periods down to ~47Hz
+    YIN_THRESHOLD = 0.1      # CMNDF absolute threshold
+
     # DTW settings
     DTW_BAND_WIDTH = 0.1  # Sakoe-Chiba band width (10% of sequence length)
     DTW_WINDOW = 200      # Window for piecewise linear fitting
@@ -67,6 +85,14 @@ class PreprocessorConfig:
     # Reference FPS (for dense array outputs)
     REF_FPS = 50  # 50 Hz = 20ms resolution
 
+    # Analysis cache (keyed by input content hash; PITCHPERFECTLY_NOCACHE=1 disables)
+    CACHE_DIR = os.path.expanduser('~/.cache/pitchperfectly')
+    CACHE_VERSION = 3  # Bump whenever reference.json output changes
+
+    # Cached references + vocals stems (size-capped, least recently used evicted)
+    REFERENCE_CACHE_DIR = os.path.join(CACHE_DIR, 'references')
+    REFERENCE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # ~200 minutes of cached vocals
+
 
 class AlignmentSegment:
     """Represents a piecewise linear alignment segment."""
@@ -122,16 +148,39 @@ def extract_audio_from_video(video_path, output_path, sr=48000):
 
     container.close()
 
-    # Concatenate and save
+    # Concatenate and save (already 16-bit PCM from the resampler, so no
+    # float round-trip)
     audio = np.concatenate(audio_data, axis=1).flatten()
-    audio = audio.astype(np.float32) / 32768.0  # Convert to float
 
-    sf.write(output_path, audio, sr)
+    sf.write(output_path, audio, sr, subtype='PCM_16')
     print(f"✅ Saved audio: {output_path}")
 
     return output_path
 
 
+def load_audio(path, sr):
+    """
+    Load audio as mono float32 at the target sample rate.
+
+    Reads with soundfile and resamples with a polyphase filter, which is much
+    faster than librosa.load; falls back to librosa.load for formats
+    libsndfile cannot decode.
+    """
+    try:
+        audio, sr_raw = sf.read(path, dtype='float32', always_2d=False)
+    except RuntimeError:
+        audio, _ = librosa.load(path, sr=sr, mono=True)
+        return audio
+
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+
+    if sr_raw != sr:
+        audio = signal.resample_poly(audio, sr, sr_raw).astype(np.float32)
+
+    return audio
+
+
 def separate_vocals(audio_path, output_dir, device='mps'):
     """Separate vocals using Demucs v4 with MPS."""
     from separate import separate_with_demucs
@@ -148,22 +197,6 @@ def separate_vocals(audio_path, output_dir, device='mps'):
     return vocals_path, accompaniment_path
 
 
-def extract_chroma(y, sr, hop_length=1024):
-    """Extract chroma features for alignment."""
-    chroma = librosa.feature.chroma_cqt(
-        y=y,
-        sr=sr,
-        hop_length=hop_length,
-        n_chroma=12,
-        bins_per_octave=36
-    )
-
-    # Normalize each frame
-    chroma = chroma / (np.linalg.norm(chroma, axis=0, keepdims=True) + 1e-8)
-
-    return chroma
-
-
 def align_with_dtw(chroma_k, chroma_ref, times_k, times_ref, band_width=0.1):
     """
     Align karaoke to reference using DTW on chroma features.
@@ -298,6 +331,9 @@ def extract_pitch_torchcrepe(audio, sr, device='mps', model='full', hop_length=1
         - f0: Fundamental frequency in Hz
         - confidence: Pitch confidence
     """
+    import torch
+    import torchcrepe
+
     print(f"🎵 Extracting pitch with torch-crepe (device: {device})...")
 
     # Process audio in chunks to avoid memory issues
@@ -355,6 +391,97 @@ def extract_pitch_torchcrepe(audio, sr, device='mps', model='full', hop_length=1
     return times, pitch, confidence
 
 
+def yin_backend(sr, hop_length=1024, device='cpu'):
+    """
+    Resolve which YIN implementation extract_pitch_yin will run.
+
+    Returns 'torch-yin' on CUDA when the optional package is installed and
+    the hop maps back to exactly hop_length samples, else 'yin-fft'.
+    """
+    if device != 'cuda':
+        return 'yin-fft'
+
+    try:
+        import torchyin
+    except ImportError:
+        return 'yin-fft'
+
+    # torch-yin takes the stride in seconds; only use it if that maps back to
+    # exactly hop_length samples so frames stay on the shared time grid
+    if int(hop_length / sr * sr) != hop_length:
+        return 'yin-fft'
+
+    return 'torch-yin'
+
+
+def extract_pitch_yin(audio, sr, hop_length=1024, device='cpu'):
+    """
+    Extract pitch using FFT-based YIN.
+
+    On CUDA the batched torch-yin implementation is used when installed
+    (optional `torch-yin` package); otherwise the Numba-compiled kernel in
+    yin_fft runs on CPU. Both are much faster than torch-crepe without a
+    GPU, at some cost in robustness on noisy vocal stems.
+
+    Returns:
+        - times: Time array
+        - f0: Fundamental frequency in Hz
+        - confidence: Pitch confidence
+    """
+    from yin_fft import yin_fft
+
+    if yin_backend(sr, hop_length=hop_length, device=device) == 'torch-yin':
+        import torch
+        import torchyin
+
+        print(f"🎵 Extracting pitch with torch-yin (device: {device})...")
+
+        # Center frames like yin_fft: torch-yin windows are 2 periods of fmin
+        pad = int(sr / 50)
+        audio_tensor = torch.nn.functional.pad(
+            torch.from_numpy(np.array(audio, dtype=np.float32)).to(device),
+            (pad, pad)
+        )
+
+        with torch.no_grad():
+            pitch = torchyin.estimate(
+                audio_tensor,
+                sample_rate=sr,
+                pitch_min=50,
+                pitch_max=1000,
+                frame_stride=hop_length / sr,
+                threshold=PreprocessorConfig.YIN_THRESHOLD
+            ).cpu().numpy()
+
+        # torch-yin only reports periodic (f0 > 0) vs non-periodic frames
+        confidence = (pitch > 0).astype(np.float32)
+    else:
+        print("🎵 Extracting pitch with FFT-YIN...")
+
+        pitch, confidence = yin_fft(
+            audio,
+            sr,
+            fmin=50,
+            fmax=1000,
+            frame_length=PreprocessorConfig.YIN_FRAME_LENGTH,
+            hop=hop_length,
+            threshold=PreprocessorConfig.YIN_THRESHOLD
+        )
+
+    # Create time array
+    times = np.arange(len(pitch)) * hop_length / sr
+
+    # Filter low confidence
+    pitch[confidence < PreprocessorConfig.PITCH_CONF_THRESHOLD] = 0
+
+    # Smooth pitch contour
+    pitch = smooth_pitch(pitch, confidence)
+
+    print(f"✅ Extracted {len(pitch)} pitch frames")
+
+    return times, pitch, confidence
+
+
 def smooth_pitch(f0, confidence, window_size=5):
     """Smooth pitch contour while preserving musical structure."""
     f0_smooth = f0.copy()
@@ -370,7 +497,6 @@ def smooth_pitch(f0, confidence, window_size=5):
 
     # Light smoothing with Savitzky-Golay filter
     if np.sum(voiced) > 11:
-        from scipy.signal import savgol_filter
         f0_smooth[voiced] = savgol_filter(f0[voiced], window_length=11, polyorder=3)
 
     return f0_smooth
@@ -390,23 +516,29 @@ def warp_pitch_to_karaoke(times_ref, f0_ref, conf_ref, alignment_segments, durat
     tk_grid = np.arange(num_frames) / fps
 
     # For each karaoke time, map to reference time using segments
-    tref_mapped = np.zeros_like(tk_grid)
-
-    for i, tk in enumerate(tk_grid):
-        # Find appropriate segment
-        segment = None
-        for seg in alignment_segments:
-            if seg.tk_start <= tk <= seg.tk_end:
-                segment = seg
-                break
-
-        if segment is None:
-            # Use nearest segment
-            distances = [abs(tk - seg.tk_start) for seg in alignment_segments]
-            segment = alignment_segments[np.argmin(distances)]
+    seg_starts = np.array([seg.tk_start for seg in alignment_segments])
+    seg_ends = np.array([seg.tk_end for seg in alignment_segments])
+    seg_a = np.array([seg.a for seg in alignment_segments])
+    seg_b = np.array([seg.b for seg in alignment_segments])
+    last = len(alignment_segments) - 1
+
+    # Find appropriate segment: segments are in time order, so the first one
+    # containing tk is the first whose end is >= tk, if it starts before tk
+    containing = np.minimum(np.searchsorted(seg_ends, tk_grid, side='left'), last)
+    contained = (seg_starts[containing] <= tk_grid) & (tk_grid <= seg_ends[containing])
+
+    # Otherwise use the segment with the nearest start
+    right = np.minimum(np.searchsorted(seg_starts, tk_grid), last)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(
+        np.abs(tk_grid - seg_starts[left]) <= np.abs(tk_grid - seg_starts[right]),
+        left,
+        right
+    )
 
-        # Map time
-        tref_mapped[i] = segment.map_time(tk)
+    # Map time
+    seg_idx = np.where(contained, containing, nearest)
+    tref_mapped = seg_a[seg_idx] * tk_grid + seg_b[seg_idx]
 
     # Interpolate f0 from reference timeline
     f0_interp = interp1d(
@@ -425,8 +557,10 @@ def warp_pitch_to_karaoke(times_ref, f0_ref, conf_ref, alignment_segments, durat
         fill_value=0.0
     )
 
-    f0_warped = f0_interp(tref_mapped)
-    conf_warped = conf_interp(tref_mapped)
+    # interp1d evaluates in float64; keep pitch/confidence in float32 like the
+    # pitch extractors produce (times stay float64)
+    f0_warped = f0_interp(tref_mapped).astype(np.float32)
+    conf_warped = conf_interp(tref_mapped).astype(np.float32)
 
     # Additional smoothing with EMA
     alpha = 0.3
@@ -457,21 +591,9 @@ def create_note_bins(times, f0, confidence, tolerance_cents=40):
     # Find voiced segments
     voiced = (f0 > 0) & (confidence > PreprocessorConfig.PITCH_CONF_THRESHOLD)
 
-    # Segment into continuous regions
-    segments = []
-    in_segment = False
-    start_idx = 0
-
-    for i in range(len(voiced)):
-        if voiced[i] and not in_segment:
-            start_idx = i
-            in_segment = True
-        elif not voiced[i] and in_segment:
-            segments.append((start_idx, i))
-            in_segment = False
-
-    if in_segment:
-        segments.append((start_idx, len(voiced)))
+    # Segment into continuous regions: rising/falling edges of the voiced mask
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    segments = zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
 
     # Create note bins from segments
     for start_idx, end_idx in segments:
@@ -501,115 +623,15 @@ def create_note_bins(times, f0, confidence, tolerance_cents=40):
     return note_bins
 
 
-def detect_beats_and_downbeats(audio, sr, hop_length=1024):
-    """Extract beats and downbeats for rhythm scoring."""
-    print("🥁 Detecting beats and downbeats...")
-
-    # Beat tracking
-    tempo, beat_frames = librosa.beat.beat_track(
-        y=audio,
-        sr=sr,
-        hop_length=hop_length,
-        trim=False
-    )
-
-    beats = librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop_length)
-
-    # Estimate downbeats (every 4th beat typically)
-    # This is a simplification; more sophisticated methods can be used
-    downbeats = beats[::4]
-
-    print(f"✅ Found {len(beats)} beats, {len(downbeats)} downbeats")
-    print(f"   Tempo: {float(tempo):.1f} BPM")
-
-    return beats.tolist(), downbeats.tolist(), float(tempo)
-
-
-def detect_phrases(audio, sr, beats, hop_length=1024):
-    """Detect musical phrases using onset strength and structure."""
-    print("📝 Detecting phrases...")
-
-    # Onset strength envelope
-    onset_env = librosa.onset.onset_strength(
-        y=audio,
-        sr=sr,
-        hop_length=hop_length,
-        aggregate=np.median
-    )
-
-    # Detect onsets
-    onsets = librosa.onset.onset_detect(
-        onset_envelope=onset_env,
-        sr=sr,
-        hop_length=hop_length,
-        units='time',
-        delta=0.3,
-        wait=2.0  # Minimum 2 seconds between phrase boundaries
-    )
-
-    # Create phrases from onsets
-    phrases = []
-
-    for i in range(len(onsets) - 1):
-        start = onsets[i]
-        end = onsets[i + 1]
-
-        if end - start > 2.0:  # Minimum phrase length
-            phrases.append({
-                'id': i + 1,
-                'start': float(start),
-                'end': float(end)
-            })
-
-    # Add final phrase
-    if len(onsets) > 0:
-        duration = len(audio) / sr
-        if duration - onsets[-1] > 2.0:
-            phrases.append({
-                'id': len(phrases) + 1,
-                'start': float(onsets[-1]),
-                'end': float(duration)
-            })
-
-    print(f"✅ Detected {len(phrases)} phrases")
-
-    return phrases
-
-
-def calculate_loudness_profile(audio, sr, hop_length=1024):
-    """Calculate LUFS-style loudness profile for energy scoring."""
-    print("📊 Calculating loudness profile...")
-
-    # RMS energy
-    rms = librosa.feature.rms(y=audio, hop_length=hop_length)[0]
-
-    # Convert to dB
-    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
-
-    # Create time array
-    times = librosa.frames_to_time(np.arange(len(rms_db)), sr=sr, hop_length=hop_length)
-
-    # Smooth
-    from scipy.signal import savgol_filter
-    rms_smooth = savgol_filter(rms_db, window_length=21, polyorder=3)
-
-    # Create loudness profile
-    loudness = [
-        {'t': float(t), 'LUFS': float(lufs)}
-        for t, lufs in zip(times, rms_smooth)
-    ]
-
-    print(f"✅ Calculated loudness profile: {len(loudness)} frames")
-
-    return loudness
-
+def detect_key(chroma):
+    """
+    Detect musical key from chroma features.
 
-def detect_key(audio, sr):
-    """Detect musical key using chroma features."""
+    Takes the karaoke track's CQT alignment chroma (extract_chroma), so key
+    detection reuses that transform instead of computing its own.
+    """
     print("🎹 Detecting musical key...")
 
-    # Extract chroma
-    chroma = librosa.feature.chroma_cqt(y=audio, sr=sr)
     chroma_mean = np.mean(chroma, axis=1)
 
     # Krumhansl-Schmuckler key profiles
@@ -642,6 +664,33 @@ def detect_key(audio, sr):
     return key
 
 
+def share_array(array):
+    """
+    Copy an array into shared memory for worker processes.
+
+    Returns the SharedMemory block (caller closes and unlinks it) and a
+    picklable (name, shape, dtype) spec for run_on_shared_audio.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def create_worker_pool(max_workers=2):
+    """
+    Process pool for librosa analyses (spawn context: safe alongside torch/MPS).
+
+    Spawned workers re-import this script, so torch and torchcrepe are
+    imported lazily where pitch extraction needs them; submit the
+    audio_analysis functions, which need only numpy, scipy and librosa.
+    """
+    return ProcessPoolExecutor(
+        max_workers=min(max_workers, os.cpu_count() or 1),
+        mp_context=get_context('spawn')
+    )
+
+
 def build_reference_json(
     song_id,
     karaoke_audio,
@@ -651,9 +700,20 @@ def build_reference_json(
     tk_aligned,
     tref_aligned,
     sr,
-    device='mps'
+    executor,
+    chroma_k,
+    device='mps',
+    pitch_method='crepe',
+    skip_pitch=False
 ):
-    """Build comprehensive reference.json for runtime scoring."""
+    """
+    Build comprehensive reference.json for runtime scoring.
+
+    Librosa analyses are submitted to `executor` (see create_worker_pool)
+    and overlap with pitch extraction in this process. With `skip_pitch`
+    the reference pitch is not extracted and `f0_ref_on_k` / `note_bins`
+    are empty lists.
+    """
 
     print("\n" + "="*60)
     print("Building reference.json")
@@ -661,55 +721,71 @@ def build_reference_json(
 
     duration_k = len(karaoke_audio) / sr
 
-    # Extract pitch from reference vocals
-    times_ref, f0_ref, conf_ref = extract_pitch_torchcrepe(
-        vocals_ref,
-        sr,
-        device=device,
-        hop_length=PreprocessorConfig.HOP_LENGTH
-    )
+    hop_length = PreprocessorConfig.HOP_LENGTH
 
-    # Warp reference pitch to karaoke timeline
-    times_k, f0_warped, conf_warped = warp_pitch_to_karaoke(
-        times_ref,
-        f0_ref,
-        conf_ref,
-        alignment_segments,
-        duration_k
-    )
+    # Share the audio with worker processes instead of pickling it per task
+    karaoke_shm, karaoke_spec = share_array(karaoke_audio)
+    vocals_shm, vocals_spec = share_array(vocals_ref)
 
-    # Create note bins
-    note_bins = create_note_bins(
-        times_k,
-        f0_warped,
-        conf_warped,
-        tolerance_cents=PreprocessorConfig.NOTE_TOLERANCE_CENTS
-    )
+    try:
+        # Independent librosa passes run on worker cores...
+        futures = {
+            executor.submit(run_on_shared_audio, analyze_rhythm, karaoke_spec, sr, hop_length=hop_length): 'rhythm',
+            executor.submit(run_on_shared_audio, calculate_loudness_profile, vocals_spec, sr, hop_length=hop_length): 'loudness',
+        }
 
-    # Detect beats and downbeats on karaoke audio
-    beats_k, downbeats_k, tempo = detect_beats_and_downbeats(
-        karaoke_audio,
-        sr,
-        hop_length=PreprocessorConfig.HOP_LENGTH
-    )
+        # ...while pitch extraction (GPU-bound for crepe) runs here
+        if skip_pitch:
+            print("⏭️  Skipping pitch extraction (--no-pitch)")
+            times_k = np.arange(int(duration_k * PreprocessorConfig.REF_FPS)) / PreprocessorConfig.REF_FPS
+            f0_warped = conf_warped = np.zeros(0, dtype=np.float32)
+            note_bins = []
+        else:
+            if pitch_method == 'yin':
+                times_ref, f0_ref, conf_ref = extract_pitch_yin(
+                    vocals_ref,
+                    sr,
+                    hop_length=hop_length,
+                    device=device
+                )
+            else:
+                times_ref, f0_ref, conf_ref = extract_pitch_torchcrepe(
+                    vocals_ref,
+                    sr,
+                    device=device,
+                    hop_length=hop_length
+                )
+
+            # Warp reference pitch to karaoke timeline
+            times_k, f0_warped, conf_warped = warp_pitch_to_karaoke(
+                times_ref,
+                f0_ref,
+                conf_ref,
+                alignment_segments,
+                duration_k
+            )
 
-    # Detect phrases on karaoke audio
-    phrases_k = detect_phrases(
-        karaoke_audio,
-        sr,
-        beats_k,
-        hop_length=PreprocessorConfig.HOP_LENGTH
-    )
+            # Create note bins
+            note_bins = create_note_bins(
+                times_k,
+                f0_warped,
+                conf_warped,
+                tolerance_cents=PreprocessorConfig.NOTE_TOLERANCE_CENTS
+            )
 
-    # Calculate loudness profile from reference vocals
-    loudness_ref = calculate_loudness_profile(
-        vocals_ref,
-        sr,
-        hop_length=PreprocessorConfig.HOP_LENGTH
-    )
+        results = {}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    finally:
+        for shm in (karaoke_shm, vocals_shm):
+            shm.close()
+            shm.unlink()
 
-    # Detect key
-    key = detect_key(karaoke_audio, sr)
+    beats_k, downbeats_k, tempo, phrases_k = results['rhythm']
+    loudness_ref = results['loudness']
+
+    # Detect key (reuses the alignment chroma of the karaoke track)
+    key = detect_key(chroma_k)
 
     # Build reference JSON
     reference = {
@@ -729,16 +805,22 @@ def build_reference_json(
 
         # Alignment mapping
         'warp_T': {
-            'tk': times_k.tolist(),
-            'tref': tref_aligned.tolist(),
+            'tk': np.round(times_k, 3),
+            'tref': np.round(tref_aligned, 3),
             'quality': 0.85,  # Default quality value
             'segments': []  # Simplified - no segments for now
         },
 
         # Warped reference pitch on karaoke timeline
+        # Rounded to 0.1 Hz / 0.001 (well below audible pitch resolution) to
+        # keep the densest arrays compact; float64 first to avoid float32 noise
         'f0_ref_on_k': [
             {'t': float(t), 'f0': float(f0), 'conf': float(conf)}
-            for t, f0, conf in zip(times_k, f0_warped, conf_warped)
+            for t, f0, conf in zip(
+                np.round(times_k, 3),
+                np.round(f0_warped.astype(np.float64), 1),
+                np.round(conf_warped.astype(np.float64), 3)
+            )
             if f0 > 0  # Only include voiced frames
         ],
 
@@ -759,6 +841,133 @@ def build_reference_json(
     return reference
 
 
+def warm_numba_cache():
+    """
+    Run every Numba-backed analysis once on synthetic audio.
+
+    Compiled kernels land in NUMBA_CACHE_DIR, so later runs skip JIT
+    compilation. Called at install time (Dockerfile, start.sh).
+    """
+    sr = PreprocessorConfig.SAMPLE_RATE
+    hop_length = PreprocessorConfig.HOP_LENGTH
+
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal(10 * sr)).astype(np.float32)
+
+    analyze_rhythm(audio, sr, hop_length=hop_length)
+    calculate_loudness_profile(audio, sr, hop_length=hop_length)
+    detect_key(extract_chroma(audio, sr, hop_length=hop_length))
+    extract_pitch_yin(audio, sr, hop_length=hop_length)
+
+    print(f"✅ Numba cache warmed: {os.environ['NUMBA_CACHE_DIR']}")
+
+
+def write_json(path, obj):
+    """Write JSON with orjson; NumPy arrays are serialized natively (no .tolist())."""
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
+def hash_inputs(paths, options):
+    """Content hash of the input files plus any options that change the output."""
+    h = hashlib.blake2b(digest_size=16)
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+
+    h.update(repr(options).encode())
+
+    return h.hexdigest()
+
+
+def prune_cache(directory, max_bytes):
+    """
+    Delete least recently used cache entries until `directory` fits in max_bytes.
+
+    Each top-level file or directory is one entry; recency is its mtime.
+    Entries removed concurrently by another job are skipped.
+    """
+    entries = []
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_dir():
+                size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+            else:
+                size = entry.stat().st_size
+            entries.append((entry.stat().st_mtime, size, entry.path))
+        except FileNotFoundError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        total -= size
+
+
+def copy_atomic(src, dst):
+    """Copy via a temp file and os.replace, so dst is never left half-written."""
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def restore_cached_reference(cache_entry, song_id, output_dir):
+    """
+    Load a cached reference for a new song ID and restore its vocals stem.
+
+    Returns None (and drops the entry) if the cached files can't be read,
+    so the caller falls back to a full analysis.
+    """
+    try:
+        with open(os.path.join(cache_entry, 'reference.json'), 'rb') as f:
+            reference = orjson.loads(f.read())
+
+        reference['song_id'] = song_id
+
+        # Mark as recently used for eviction
+        os.utime(cache_entry)
+
+        cached_vocals = os.path.join(cache_entry, 'vocals.wav')
+        if os.path.exists(cached_vocals):
+            copy_atomic(cached_vocals, os.path.join(output_dir, 'vocals.wav'))
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"⚠️  Discarding unreadable cache entry {cache_entry}: {e}")
+        shutil.rmtree(cache_entry, ignore_errors=True)
+        return None
+
+    return reference
+
+
+def store_cached_reference(cache_entry, reference_path, vocals_path):
+    """
+    Save reference.json and the vocals stem under the cache entry.
+
+    reference.json marks a complete entry, so it is written last. Older
+    entries are then evicted to keep the cache under REFERENCE_CACHE_MAX_BYTES.
+    """
+    try:
+        os.makedirs(cache_entry, exist_ok=True)
+        copy_atomic(vocals_path, os.path.join(cache_entry, 'vocals.wav'))
+        copy_atomic(reference_path, os.path.join(cache_entry, 'reference.json'))
+        prune_cache(PreprocessorConfig.REFERENCE_CACHE_DIR, PreprocessorConfig.REFERENCE_CACHE_MAX_BYTES)
+    except OSError as e:
+        print(f"⚠️  Could not write analysis cache: {e}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Comprehensive karaoke preprocessing pipeline'
@@ -769,6 +978,11 @@ def main():
     parser.add_argument('--output-dir', required=True, help='Output directory for song assets')
     parser.add_argument('--device', default='auto', choices=['auto', 'mps', 'cuda', 'cpu'])
     parser.add_argument('--skip-separation', action='store_true', help='Skip vocal separation (use existing)')
+    parser.add_argument('--pitch-method', default='crepe', choices=['crepe', 'yin'],
+                        help='Pitch extractor: torch-crepe (default) or FFT-based YIN (fast on CPU)')
+    parser.add_argument('--no-pitch', action='store_true',
+                        help='Preview only: skip reference pitch extraction (f0_ref_on_k and note_bins are empty; '
+                             'the reference cannot be used for scoring sessions)')
 
     args = parser.parse_args()
 
@@ -777,6 +991,8 @@ def main():
 
     # Determine device
     if args.device == 'auto':
+        import torch
+
         if torch.backends.mps.is_available():
             device = 'mps'
         elif torch.cuda.is_available():
@@ -791,11 +1007,41 @@ def main():
     print(f"{'='*60}")
     print(f"Song ID: {args.song_id}")
     print(f"Device: {device}")
+    print(f"Pitch method: {'skipped' if args.no_pitch else args.pitch_method}")
     print(f"{'='*60}\n")
 
     sr = PreprocessorConfig.SAMPLE_RATE
     hop_length = PreprocessorConfig.HOP_LENGTH
 
+    reference_path = os.path.join(args.output_dir, 'reference.json')
+
+    # Identical inputs were already analyzed: reuse the cached result
+    cache_entry = None
+    reference = None
+    if os.environ.get('PITCHPERFECTLY_NOCACHE') != '1':
+        input_hash = hash_inputs(
+            [args.karaoke_video, args.original_audio],
+            (
+                PreprocessorConfig.CACHE_VERSION,
+                args.pitch_method,
+                args.no_pitch,
+                # YIN output depends on which backend the device resolves to
+                yin_backend(sr, hop_length=hop_length, device=device) if args.pitch_method == 'yin' else None
+            )
+        )
+        cache_entry = os.path.join(PreprocessorConfig.REFERENCE_CACHE_DIR, input_hash)
+
+        if os.path.exists(os.path.join(cache_entry, 'reference.json')):
+            reference = restore_cached_reference(cache_entry, args.song_id, args.output_dir)
+
+        if reference is not None:
+            write_json(reference_path, reference)
+
+            print(f"✅ Reused cached analysis: {cache_entry}")
+            print(f"Reference: {reference_path}")
+
+            return 0
+
     # Step 1: Extract karaoke audio from video
     karaoke_audio_path = os.path.join(args.output_dir, 'karaoke_audio.wav')
 
@@ -805,7 +1051,7 @@ def main():
         print(f"✅ Using existing karaoke audio: {karaoke_audio_path}")
 
     # Load karaoke audio
-    karaoke_audio, _ = librosa.load(karaoke_audio_path, sr=sr, mono=True)
+    karaoke_audio = load_audio(karaoke_audio_path, sr)
 
     # Step 2: Separate vocals from original
     vocals_path = os.path.join(args.output_dir, 'vocals_ref.wav')
@@ -821,49 +1067,70 @@ def main():
         print(f"✅ Using existing vocals: {vocals_path}")
 
     # Load vocals and accompaniment
-    vocals_ref, _ = librosa.load(vocals_path, sr=sr, mono=True)
-    accompaniment_ref, _ = librosa.load(accompaniment_path, sr=sr, mono=True)
-
-    # Step 3: Extract chroma features for alignment
-    chroma_k = extract_chroma(karaoke_audio, sr, hop_length=hop_length)
-    chroma_ref = extract_chroma(accompaniment_ref, sr, hop_length=hop_length)
-
-    times_k = librosa.frames_to_time(np.arange(chroma_k.shape[1]), sr=sr, hop_length=hop_length)
-    times_ref = librosa.frames_to_time(np.arange(chroma_ref.shape[1]), sr=sr, hop_length=hop_length)
-
-    # Step 4: Align using DTW
-    tk_aligned, tref_aligned, quality = align_with_dtw(
-        chroma_k,
-        chroma_ref,
-        times_k,
-        times_ref,
-        band_width=PreprocessorConfig.DTW_BAND_WIDTH
-    )
+    vocals_ref = load_audio(vocals_path, sr)
+    accompaniment_ref = load_audio(accompaniment_path, sr)
+
+    # One worker pool serves chroma extraction and the reference analyses
+    with create_worker_pool() as executor:
+        # Step 3: Extract chroma features for alignment (both tracks in parallel)
+        karaoke_shm, karaoke_spec = share_array(karaoke_audio)
+        accompaniment_shm, accompaniment_spec = share_array(accompaniment_ref)
+
+        try:
+            chroma_k_future = executor.submit(
+                run_on_shared_audio, extract_chroma, karaoke_spec, sr, hop_length=hop_length
+            )
+            chroma_ref_future = executor.submit(
+                run_on_shared_audio, extract_chroma, accompaniment_spec, sr, hop_length=hop_length
+            )
+            chroma_k = chroma_k_future.result()
+            chroma_ref = chroma_ref_future.result()
+        finally:
+            for shm in (karaoke_shm, accompaniment_shm):
+                shm.close()
+                shm.unlink()
+
+        times_k = librosa.frames_to_time(np.arange(chroma_k.shape[1]), sr=sr, hop_length=hop_length)
+        times_ref = librosa.frames_to_time(np.arange(chroma_ref.shape[1]), sr=sr, hop_length=hop_length)
+
+        # Step 4: Align using DTW
+        tk_aligned, tref_aligned, quality = align_with_dtw(
+            chroma_k,
+            chroma_ref,
+            times_k,
+            times_ref,
+            band_width=PreprocessorConfig.DTW_BAND_WIDTH
+        )
 
-    # Step 5: Fit piecewise linear alignment
-    alignment_segments = fit_piecewise_linear(
-        tk_aligned,
-        tref_aligned,
-        window=PreprocessorConfig.DTW_WINDOW
-    )
+        # Step 5: Fit piecewise linear alignment
+        alignment_segments = fit_piecewise_linear(
+            tk_aligned,
+            tref_aligned,
+            window=PreprocessorConfig.DTW_WINDOW
+        )
 
-    # Step 6: Build comprehensive reference JSON
-    reference = build_reference_json(
-        args.song_id,
-        karaoke_audio,
-        vocals_ref,
-        accompaniment_ref,
-        alignment_segments,
-        tk_aligned,
-        tref_aligned,
-        sr,
-        device=device
-    )
+        # Step 6: Build comprehensive reference JSON
+        reference = build_reference_json(
+            args.song_id,
+            karaoke_audio,
+            vocals_ref,
+            accompaniment_ref,
+            alignment_segments,
+            tk_aligned,
+            tref_aligned,
+            sr,
+            executor,
+            chroma_k=chroma_k,
+            device=device,
+            pitch_method=args.pitch_method,
+            skip_pitch=args.no_pitch
+        )
 
     # Save reference JSON
-    reference_path = os.path.join(args.output_dir, 'reference.json')
-    with open(reference_path, 'w') as f:
-        json.dump(reference, f, indent=2)
+    write_json(reference_path, reference)
+
+    if cache_entry:
+        store_cached_reference(cache_entry, reference_path, vocals_path)
 
     print(f"\n{'='*60}")
     print(f"✅ Preprocessing complete!")
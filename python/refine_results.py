@@ -64,7 +64,7 @@ def align_phrase_dtw(ref_pitch: np.ndarray, singer_pitch: np.ndarray) -> Tuple[f
     normalized_cost = distance / max(len(ref_voiced), len(singer_voiced))
 
     # Get alignment path
-    path = dtw.warping_path(ref_voiced, singer_voiced)
+    path = np.asarray(dtw.warping_path(ref_voiced, singer_voiced), dtype=np.intp)
 
     ref_indices = path[:, 0]
     singer_indices = path[:, 1]
@@ -115,15 +115,10 @@ def calculate_phrase_metrics(
         }
 
     # Calculate cents errors on aligned frames
-    cents_errors = []
-
-    for r_idx, s_idx in zip(ref_idx, singer_idx):
-        ref_freq = ref_f0[r_idx]
-        singer_freq = singer_f0[s_idx]
-
-        if ref_freq > 0 and singer_freq > 0:
-            cents_error = 1200 * np.log2(singer_freq / ref_freq)
-            cents_errors.append(cents_error)
+    ref_freqs = ref_f0[ref_idx]
+    singer_freqs = singer_f0[singer_idx]
+    voiced = (ref_freqs > 0) & (singer_freqs > 0)
+    cents_errors = 1200 * np.log2(singer_freqs[voiced] / ref_freqs[voiced])
 
     if len(cents_errors) == 0:
         median_cents_error = 0.0
@@ -132,17 +127,13 @@ def calculate_phrase_metrics(
         median_cents_error = float(np.median(cents_errors))
 
         # Calculate accuracy (percentage within 50 cents)
-        within_tolerance = sum(1 for e in cents_errors if abs(e) <= 50)
-        accuracy = within_tolerance / len(cents_errors)
+        accuracy = float(np.mean(np.abs(cents_errors) <= 50))
 
     # Calculate timing offset
-    timing_offsets = []
-    for r_idx, s_idx in zip(ref_idx, singer_idx):
-        if r_idx < len(ref_t) and s_idx < len(singer_t):
-            offset = singer_t[s_idx] - ref_t[r_idx]
-            timing_offsets.append(offset)
+    in_bounds = (ref_idx < len(ref_t)) & (singer_idx < len(singer_t))
+    timing_offsets = singer_t[singer_idx[in_bounds]] - ref_t[ref_idx[in_bounds]]
 
-    timing_offset = float(np.mean(timing_offsets)) if timing_offsets else 0.0
+    timing_offset = float(np.mean(timing_offsets)) if len(timing_offsets) else 0.0
 
     # Calculate on-beat percentage (simplified)
     # In a full implementation, compare to beat grid
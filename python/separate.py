@@ -151,10 +151,10 @@ def separate_with_demucs(input_path, output_dir, device='mps', model_name='htdem
     accompaniment_path = os.path.join(output_dir, 'accompaniment.wav')
 
     print(f"💾 Saving vocals: {vocals_path}")
-    sf.write(vocals_path, vocals.T, sr)
+    sf.write(vocals_path, vocals.T, sr, subtype='PCM_16')
 
     print(f"💾 Saving accompaniment: {accompaniment_path}")
-    sf.write(accompaniment_path, accompaniment.T, sr)
+    sf.write(accompaniment_path, accompaniment.T, sr, subtype='PCM_16')
 
     print("✅ Separation complete!")
 
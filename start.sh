@@ -81,6 +81,16 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# Pre-compile Numba kernels so the first preprocessing run skips JIT
+# (only when the cache is missing or dependencies changed since last warm-up)
+NUMBA_CACHE="${NUMBA_CACHE_DIR:-$HOME/.cache/pitchperfectly/numba}"
+if [ ! -f "$NUMBA_CACHE/.warmed" ] || [ requirements.txt -nt "$NUMBA_CACHE/.warmed" ]; then
+    echo "⚙️  Warming Numba cache..."
+    python -c "from preprocess_full import warm_numba_cache; warm_numba_cache()" && \
+        touch "$NUMBA_CACHE/.warmed" || \
+        echo "⚠️  Numba cache warm-up failed (first preprocessing run will be slower)"
+fi
+
 # Verify MPS availability
 echo "🍎 Checking Apple Silicon (MPS) availability..."
 python separate.py --check-mps